@@ -3,6 +3,8 @@ import requests
 from datetime import datetime
 import time
 import os
+import argparse
+from src.profiling import profile_stage, enable_profiling
 from typing import Optional, Dict, List
 
 
@@ -82,6 +84,7 @@ class F1DataCollector:
                 qualifying.append(result)
         return pd.DataFrame(qualifying)
 
+    @profile_stage('collect')
     def create_bronze_dataset(self, start_year: int, end_year: int) -> None:
         """Create comprehensive bronze dataset with all relevant data"""
         print(f"\nStarting data collection from {start_year} to {end_year}")
@@ -143,6 +146,14 @@ class F1DataCollector:
 
 # Example usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect bronze race and qualifying data from the Ergast API")
+    parser.add_argument('--profile', action='store_true', help="Profile each stage (same as F1_PROFILE=1)")
+    parser.add_argument('--start-year', type=int, default=None, help="First season to collect (default: 40 years ago)")
+    parser.add_argument('--end-year', type=int, default=None, help="Last season to collect (default: current year)")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
     collector = F1DataCollector()
 
     # Test current season schedule
@@ -150,8 +161,8 @@ if __name__ == "__main__":
     print("\nCurrent Season Schedule:", len(schedule), "races")
 
     # Create historical dataset for last 5 years
-    current_year = datetime.now().year
-    start_year = current_year - 40  # Collect last 10 years of data
+    current_year = args.end_year or datetime.now().year
+    start_year = args.start_year or current_year - 40  # Collect last 10 years of data
     print(f"\nCollecting data from {start_year} to {current_year}")
     collector.create_bronze_dataset(start_year, current_year)
 
@@ -0,0 +1,158 @@
+import argparse
+import os
+import sqlite3
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(current_dir, 'data', 'csv', 'f1_history.db')
+DEFAULT_CSV_PATH = os.path.join(current_dir, 'data', 'csv', 'f1_processed_data.csv')
+
+# Columns copied from the silver dataset into the store
+RESULT_COLUMNS = [
+    'year', 'round', 'raceName', 'date', 'driverId', 'driverCode', 'driverName', 'Constructor',
+    'GridPosition', 'Position', 'positionText', 'Points', 'PositionsGained', 'laps', 'status',
+    'Q1_seconds', 'Q2_seconds', 'Q3_seconds', 'BestQualiTime'
+]
+
+INDEXES = {
+    'idx_results_year_round': '(year, round)',
+    'idx_results_driver': '(driverId, year, round)',
+    'idx_results_constructor': '(Constructor, year, round)',
+    'idx_results_race': '(raceName, year)',
+}
+
+
+class F1RaceStore:
+    """Indexed SQLite copy of the silver race results for point and range lookups.
+
+    Written by F1DataProcessor alongside f1_processed_data.csv. Queries return
+    lists of dicts (or plain numbers) so serving code does not need pandas.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # sqlite3 connections cannot be shared across threads, so keep one per thread
+        if not hasattr(self._local, 'connection'):
+            connection = sqlite3.connect(self.db_path)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return self._local.connection
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def write_results(self, df):
+        """Replace the results table with a silver DataFrame and rebuild the indexes"""
+        columns = [col for col in RESULT_COLUMNS if col in df.columns]
+        tmp_path = f"{self.db_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        # Build into a temporary file so readers never see a half-written store
+        connection = sqlite3.connect(tmp_path)
+        try:
+            df[columns].to_sql('results', connection, index=False)
+            for name, index_columns in INDEXES.items():
+                connection.execute(f"CREATE INDEX {name} ON results {index_columns}")
+            connection.execute("ANALYZE")
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, self.db_path)
+        print(f"Saved {len(df)} results to {self.db_path}")
+
+    def build_from_csv(self, csv_path=DEFAULT_CSV_PATH):
+        """Populate the store from an existing f1_processed_data.csv"""
+        import pandas as pd
+        self.write_results(pd.read_csv(csv_path))
+
+    def query(self, sql, params=()):
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def race_results(self, year, round_num):
+        """All classified and unclassified entries of one race, in finishing order"""
+        return self.query(
+            "SELECT * FROM results WHERE year = ? AND round = ? "
+            "ORDER BY Position IS NULL, Position",
+            (year, round_num)
+        )
+
+    def season_results(self, start_year, end_year=None):
+        """Every result between two seasons, inclusive"""
+        return self.query(
+            "SELECT * FROM results WHERE year BETWEEN ? AND ? ORDER BY year, round, Position",
+            (start_year, end_year or start_year)
+        )
+
+    def driver_results(self, driver_id, start_year=None, end_year=None, race_name=None):
+        """One driver's history, optionally limited to a year range and/or a single track"""
+        sql = "SELECT * FROM results WHERE driverId = ? AND year BETWEEN ? AND ?"
+        params = [driver_id, start_year or 0, end_year or 9999]
+        if race_name is not None:
+            sql += " AND raceName = ?"
+            params.append(race_name)
+        return self.query(sql + " ORDER BY year, round", params)
+
+    def constructor_results(self, constructor, start_year=None, end_year=None):
+        return self.query(
+            "SELECT * FROM results WHERE Constructor = ? AND year BETWEEN ? AND ? ORDER BY year, round",
+            (constructor, start_year or 0, end_year or 9999)
+        )
+
+    def track_results(self, race_name, start_year=None, end_year=None):
+        return self.query(
+            "SELECT * FROM results WHERE raceName = ? AND year BETWEEN ? AND ? ORDER BY year, Position",
+            (race_name, start_year or 0, end_year or 9999)
+        )
+
+    def average_finish(self, driver_id, race_name=None, start_year=None, end_year=None):
+        """Mean finishing position over classified finishes, or None without data.
+
+        Position is set for every entry, retirements included, so classification
+        comes from positionText, which is a letter (R, D, W, ...) when unclassified.
+        """
+        sql = ("SELECT AVG(Position) FROM results "
+               "WHERE driverId = ? AND year BETWEEN ? AND ? AND positionText GLOB '[0-9]*'")
+        params = [driver_id, start_year or 0, end_year or 9999]
+        if race_name is not None:
+            sql += " AND raceName = ?"
+            params.append(race_name)
+        return self.connection.execute(sql, params).fetchone()[0]
+
+    def driver_form(self, driver_id, year, round_num, race_name=None, window=5):
+        """History features for a driver going into (year, round): nothing from that race or later is used.
+
+        RecentAvgPosition is the mean finish over the last `window` races, with
+        retirements counted at their recorded Position. With `race_name`, also
+        AvgTrackPosition and TrackExperience from earlier seasons at that track.
+        Averages are None when the driver has no earlier races.
+        """
+        form = {
+            'RecentAvgPosition': self.connection.execute(
+                "SELECT AVG(Position) FROM ("
+                "  SELECT Position FROM results WHERE driverId = ? AND (year < ? OR (year = ? AND round < ?))"
+                "  ORDER BY year DESC, round DESC LIMIT ?"
+                ")",
+                (driver_id, year, year, round_num, window)
+            ).fetchone()[0]
+        }
+        if race_name is not None:
+            row = self.connection.execute(
+                "SELECT AVG(Position), COUNT(*) FROM results WHERE driverId = ? AND raceName = ? AND year < ?",
+                (driver_id, race_name, year)
+            ).fetchone()
+            form['AvgTrackPosition'], form['TrackExperience'] = row
+        return form
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the race store from an existing silver CSV")
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help="Silver dataset to load")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite file to write")
+    args = parser.parse_args()
+
+    F1RaceStore(args.db).build_from_csv(args.csv)
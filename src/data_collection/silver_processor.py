@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 import ast
 import os
+import argparse
+from src.profiling import profile_stage, enable_profiling
+from src.data_collection.race_store import F1RaceStore
 
 
 class F1DataProcessor:
@@ -65,6 +68,7 @@ class F1DataProcessor:
         except:
             return np.nan
 
+    @profile_stage('clean')
     def clean_race_data(self):
         """Clean and process race results data"""
         print("Processing race data...")
@@ -91,6 +95,7 @@ class F1DataProcessor:
 
         print("Race data processed")
 
+    @profile_stage('clean')
     def clean_qualifying_data(self):
         """Clean and process qualifying data"""
         print("Processing qualifying data...")
@@ -118,6 +123,7 @@ class F1DataProcessor:
 
         print("Qualifying data processed")
 
+    @profile_stage('merge')
     def merge_data(self):
         """Merge race and qualifying data"""
         print("Merging race and qualifying data...")
@@ -148,7 +154,16 @@ class F1DataProcessor:
             processed_df.to_csv(output_file, index=False)
             print(f"Saved processed data to {output_file}")
 
+            # Indexed copy for ad-hoc and per-driver lookups
+            F1RaceStore(f"{self.data_dir}/f1_history.db").write_results(processed_df)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the silver dataset from bronze CSVs")
+    parser.add_argument('--profile', action='store_true', help="Profile each stage (same as F1_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
     processor = F1DataProcessor()
     processor.process_all()
\ No newline at end of file
@@ -1,20 +1,54 @@
-from flask import Flask, request, jsonify
+import json
+import os
+import queue
+import sys
+
+# app.py runs both as a script from src/models and as src.models.app under
+# gunicorn from the repo root: make the sibling modules and src.* importable either way
+models_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(models_dir))
+for path in (models_dir, project_root):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from race_predictions import F1RacePredictor
+from live_feed import LiveRace
+from src.data_collection.race_store import F1RaceStore
+from src.profiling import profile_request
 
 app = Flask(__name__)
 # Update CORS settings to allow your Vercel domain
 CORS(app, resources={
     r"/*": {
         "origins": ["https://f1-winner-prediction.vercel.app", "http://localhost:3000"],
-        "methods": ["POST", "OPTIONS"],
+        "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type", "Authorization", "Accept"]
     }
 })
 
 predictor = F1RacePredictor()
+race_store = F1RaceStore()
+
+# Live mode: F1_LIVE_FEED is a recorded feed file or a feed URL to consume in the background
+live_race = LiveRace(predictor)
+if os.environ.get('F1_LIVE_FEED'):
+    live_race.run_in_background(os.environ['F1_LIVE_FEED'],
+                                interval=float(os.environ.get('F1_LIVE_INTERVAL', 0)) or None)
+
+def fill_driver_form(data):
+    """Requests may name a driverId instead of computing RecentAvgPosition client-side"""
+    if 'RecentAvgPosition' in data or not data.get('driverId') or not race_store.exists():
+        return
+    if 'year' not in data or 'round' not in data:
+        return
+    form = race_store.driver_form(data['driverId'], data['year'], data['round'])
+    if form['RecentAvgPosition'] is not None:
+        data['RecentAvgPosition'] = form['RecentAvgPosition']
 
 @app.route('/api/predict', methods=['POST', 'OPTIONS'])
+@profile_request('predict')
 def predict():
     # Handle preflight request
     if request.method == "OPTIONS":
@@ -26,13 +60,101 @@ def predict():
 
     try:
         data = request.json
+        # Opt-in per-feature attributions, e.g. {"explain": true, ...}
+        explain = bool(data.pop('explain', False))
+        fill_driver_form(data)
         predictions = predictor.make_predictions(data)
+        if explain:
+            predictions['attributions'] = predictor.explain_predictions(data)
         response = jsonify(predictions)
         response.headers.add('Access-Control-Allow-Origin', 'https://f1-winner-prediction.vercel.app')
         return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/sweep', methods=['POST', 'OPTIONS'])
+@profile_request('sweep')
+def sweep():
+    # Handle preflight request
+    if request.method == "OPTIONS":
+        response = jsonify({'status': 'ok'})
+        response.headers.add('Access-Control-Allow-Origin', 'https://f1-winner-prediction.vercel.app')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Methods', 'POST')
+        return response
+
+    try:
+        # {"base": {...same fields as /api/predict...}, "axes": {"GridPosition": [1, 2, ...]}}
+        data = request.json
+        fill_driver_form(data['base'])
+        sweep_result = predictor.sweep_predictions(data['base'], data['axes'])
+        response = jsonify(sweep_result)
+        response.headers.add('Access-Control-Allow-Origin', 'https://f1-winner-prediction.vercel.app')
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/history', methods=['GET'])
+def history():
+    """Driver history from the local race store, e.g. ?driverId=hamilton&raceName=Italian Grand Prix&since=2010"""
+    # The store is written by the silver stage; never build it on the request path
+    if not race_store.exists():
+        return jsonify({'error': "Race store not found; run silver_processor.py "
+                                 "or race_store.py in src/data_collection to build it"}), 503
+
+    try:
+        driver_id = request.args.get('driverId')
+        if not driver_id:
+            raise ValueError("driverId is required")
+        race_name = request.args.get('raceName')
+        since = request.args.get('since', type=int)
+        until = request.args.get('until', type=int)
+        results = race_store.driver_results(driver_id, since, until, race_name)
+        return jsonify({
+            'driverId': driver_id,
+            'races': len(results),
+            'average_finish': race_store.average_finish(driver_id, race_name, since, until),
+            'results': [{key: row[key] for key in ('year', 'round', 'raceName', 'Constructor',
+                                                    'GridPosition', 'Position', 'Points')}
+                        for row in results]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/live/stream', methods=['GET'])
+def live_stream():
+    """Server-Sent Events: one 'lap' event with the full field's probabilities per lap.
+
+    Each open stream holds a worker thread for as long as the client listens,
+    so this needs a threaded or async server (see Procfile: gunicorn -k gthread).
+    A sync worker would be pinned until its timeout kills it along with the live state.
+    """
+    if not request.environ.get('wsgi.multithread'):
+        return jsonify({'error': "Live streaming needs a threaded worker, e.g. gunicorn -k gthread --threads 8; "
+                                 "poll /api/live/state instead"}), 503
+
+    def events():
+        listener = live_race.subscribe()
+        try:
+            while True:
+                try:
+                    event = listener.get(timeout=15)
+                    yield f"event: lap\ndata: {json.dumps(event)}\n\n"
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+        finally:
+            live_race.unsubscribe(listener)
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/live/state', methods=['GET'])
+def live_state():
+    return jsonify({'event': live_race.last_event, 'lag': live_race.lag_summary(), 'feed': live_race.feed_status()})
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,245 @@
+import numpy as np
+import logging
+from math import factorial
+
+logger = logging.getLogger(__name__)
+
+
+class F1FeatureAttributor:
+    """Exact path-dependent TreeSHAP attributions for a fitted tree ensemble.
+
+    Supports RandomForestClassifier (attributions of the positive class
+    probability) and HistGradientBoostingClassifier (attributions of the raw
+    log-odds). Every root-to-leaf path of every tree is compiled once into
+    tables grouped by path length; explaining a batch is then a handful of
+    vectorized NumPy lookups per group, independent of the number of trees.
+    """
+
+    # Paths with at most this many unique features get a full lookup table
+    # of 2**d attribution vectors per leaf; longer paths are evaluated directly.
+    max_table_depth = 10
+
+    def __init__(self, model, feature_columns):
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+
+        model_type = type(model).__name__
+        if model_type == 'RandomForestClassifier':
+            paths = self._random_forest_paths(model)
+            self.output = 'probability'
+        elif model_type == 'HistGradientBoostingClassifier':
+            paths = self._hist_gradient_boosting_paths(model)
+            self.output = 'log_odds'
+        else:
+            raise ValueError(f"Unsupported model type for attribution: {model_type}")
+
+        self._build_tables(paths)
+        logger.info(f"Compiled {self.n_leaves} leaf paths for {model_type} attribution")
+
+    def _random_forest_paths(self, model):
+        """Collect (leaf value, path) pairs for every tree of a random forest"""
+        positive_index = list(model.classes_).index(1)
+        scale = 1.0 / len(model.estimators_)
+
+        paths = []
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            values = tree.value[:, 0, :]
+            proba = values[:, positive_index] / values.sum(axis=1)
+            paths.extend(self._walk_tree(
+                left=tree.children_left,
+                right=tree.children_right,
+                feature=tree.feature,
+                threshold=tree.threshold,
+                cover=tree.weighted_n_node_samples,
+                missing_left=None,
+                leaf_value=proba * scale,
+                is_leaf=tree.children_left == -1
+            ))
+        return paths, 0.0
+
+    def _hist_gradient_boosting_paths(self, model):
+        """Collect (leaf value, path) pairs for every tree of a gradient boosting model"""
+        if model.n_trees_per_iteration_ != 1:
+            raise ValueError("Only binary HistGradientBoostingClassifier models are supported")
+
+        paths = []
+        for predictors in model._predictors:
+            nodes = predictors[0].nodes
+            if nodes['is_categorical'].any():
+                raise ValueError("Categorical splits are not supported for attribution")
+            paths.extend(self._walk_tree(
+                left=nodes['left'].astype(np.int64),
+                right=nodes['right'].astype(np.int64),
+                feature=nodes['feature_idx'].astype(np.int64),
+                threshold=nodes['num_threshold'],
+                cover=nodes['count'].astype(np.float64),
+                missing_left=nodes['missing_go_to_left'].astype(bool),
+                leaf_value=nodes['value'],
+                is_leaf=nodes['is_leaf'].astype(bool)
+            ))
+        return paths, float(np.ravel(model._baseline_prediction)[0])
+
+    @staticmethod
+    def _walk_tree(left, right, feature, threshold, cover, missing_left, leaf_value, is_leaf):
+        """Depth-first walk producing one merged per-feature condition set per leaf.
+
+        Repeated splits on the same feature along a path are merged into a
+        single interval (lower, upper], with the cover ratios multiplied.
+        """
+        paths = []
+        # (node, {feature: [lower, upper, zero_fraction, missing_follows_path]})
+        stack = [(0, {})]
+        while stack:
+            node, conditions = stack.pop()
+            if is_leaf[node]:
+                paths.append((leaf_value[node], conditions))
+                continue
+
+            f = int(feature[node])
+            for child, goes_left in ((left[node], True), (right[node], False)):
+                lower, upper, zero_fraction, missing_ok = conditions.get(f, (-np.inf, np.inf, 1.0, True))
+                if goes_left:
+                    upper = min(upper, threshold[node])
+                else:
+                    lower = max(lower, threshold[node])
+                if missing_left is not None:
+                    missing_ok = missing_ok and (missing_left[node] == goes_left)
+                else:
+                    missing_ok = False
+                zero_fraction *= cover[child] / cover[node]
+
+                child_conditions = dict(conditions)
+                child_conditions[f] = (lower, upper, zero_fraction, missing_ok)
+                stack.append((child, child_conditions))
+        return paths
+
+    def _build_tables(self, paths):
+        """Group leaf paths by number of unique features into dense blocks.
+
+        Leaves with a zero value contribute nothing and are dropped. Since a
+        sample either satisfies each merged condition or not, a leaf with d
+        unique features has only 2**d possible attribution vectors; for short
+        enough paths these are all precomputed so that explaining is a lookup.
+        """
+        leaves, self.base_offset = paths
+        self.n_leaves = len(leaves)
+        self.expected_value = self.base_offset
+
+        by_length = {}
+        for value, conditions in leaves:
+            if value == 0 or not conditions:
+                self.expected_value += float(value)
+                continue
+            by_length.setdefault(len(conditions), []).append((value, conditions))
+
+        self.blocks = []
+        for depth, block_leaves in sorted(by_length.items()):
+            n_leaves = len(block_leaves)
+            values = np.empty(n_leaves)
+            features = np.empty((n_leaves, depth), dtype=np.int64)
+            lower = np.empty((n_leaves, depth))
+            upper = np.empty((n_leaves, depth))
+            zero = np.empty((n_leaves, depth))
+            missing = np.empty((n_leaves, depth), dtype=bool)
+
+            for i, (value, conditions) in enumerate(block_leaves):
+                values[i] = value
+                for slot, (f, condition) in enumerate(conditions.items()):
+                    features[i, slot] = f
+                    lower[i, slot], upper[i, slot], zero[i, slot], missing[i, slot] = condition
+
+            # Shapley weights k!(d-k-1)!/d! for a coalition of size k
+            weights = np.array([factorial(k) * factorial(depth - k - 1) / factorial(depth)
+                                for k in range(depth)])
+
+            # Attributions for every pattern of satisfied conditions, (2**d, leaves, d)
+            table = None
+            if depth <= self.max_table_depth:
+                bits = 1 << np.arange(depth)
+                patterns = ((np.arange(2 ** depth)[:, None] & bits) > 0).astype(np.float64)
+                one = np.broadcast_to(patterns[:, None, :], (2 ** depth, n_leaves, depth))
+                table = values[:, None] * self._slot_attributions(one, zero, weights)
+
+            # One-hot map from (leaf, slot) to model feature for the final reduction
+            slot_to_feature = np.zeros((n_leaves * depth, self.n_features))
+            slot_to_feature[np.arange(n_leaves * depth), features.ravel()] = 1.0
+
+            self.expected_value += float(np.sum(values * np.prod(zero, axis=1)))
+            self.blocks.append({
+                'values': values,
+                'features': features,
+                'lower': lower,
+                'upper': upper,
+                'zero': zero,
+                'missing': missing,
+                'weights': weights,
+                'table': table,
+                'slot_to_feature': slot_to_feature
+            })
+
+    def explain(self, X):
+        """Compute attributions for a 2D array of (already scaled) model inputs.
+
+        Returns (expected_value, contributions) where contributions has shape
+        (n_samples, n_features) and each row sums to the model output minus
+        expected_value.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        contributions = np.zeros((X.shape[0], self.n_features))
+        for block in self.blocks:
+            contributions += self._explain_block(X, block)
+        return self.expected_value, contributions
+
+    def _explain_block(self, X, block):
+        """Attributions from one block of leaves sharing the same path length"""
+        n_samples = X.shape[0]
+        n_leaves, depth = block['zero'].shape
+
+        # one_fraction: whether each sample satisfies each merged path condition
+        x = X[:, block['features']]
+        one = (x > block['lower']) & (x <= block['upper'])
+        one = np.where(np.isnan(x), block['missing'], one)
+
+        if block['table'] is not None:
+            pattern = one @ (1 << np.arange(depth))
+            slot_contrib = block['table'][pattern, np.arange(n_leaves)]
+        else:
+            slot_contrib = block['values'][:, None] * self._slot_attributions(
+                one.astype(np.float64), block['zero'], block['weights'])
+
+        return slot_contrib.reshape(n_samples, -1) @ block['slot_to_feature']
+
+    @staticmethod
+    def _slot_attributions(one, zero, weights):
+        """Shapley value of each path slot for a unit leaf value.
+
+        one has shape (..., leaves, d) and zero (leaves, d); the leaf's game
+        is v(S) = prod_{j in S} one_j * prod_{j not in S} zero_j.
+        """
+        depth = zero.shape[1]
+
+        # Coefficients of P(t) = prod_j (zero_j + one_j * t), shape (..., leaves, depth + 1)
+        poly = np.zeros(one.shape[:-1] + (depth + 1,))
+        poly[..., 0] = 1.0
+        for slot in range(depth):
+            z = zero[:, slot][..., None]
+            o = one[..., slot][..., None]
+            poly[..., 1:slot + 2] = poly[..., 1:slot + 2] * z + poly[..., :slot + 1] * o
+            poly[..., :1] *= z
+
+        # Divide out each slot's own factor and apply the Shapley weights.
+        # one_j == 0: P / zero_j
+        sum_when_zero = (poly[..., :depth] @ weights)[..., None] / zero
+        # one_j == 1: synthetic division by (zero_j + t), highest degree first
+        q = poly[..., depth][..., None] * np.ones_like(zero)
+        sum_when_one = q * weights[depth - 1]
+        for k in range(depth - 1, 0, -1):
+            q *= -zero
+            q += poly[..., k][..., None]
+            sum_when_one += q * weights[k - 1]
+
+        return (one - zero) * np.where(one > 0, sum_when_one, sum_when_zero)
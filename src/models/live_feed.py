@@ -0,0 +1,297 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def parse_message(line):
+    """One feed line to a message dict; blank or malformed lines are logged and give None"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        logger.error(f"Skipping undecodable feed line: {e}")
+        return None
+    if not isinstance(message, dict):
+        logger.error(f"Skipping feed line that is not a JSON object: {line[:100]!r}")
+        return None
+    return message
+
+
+def read_file_feed(path, interval=None):
+    """Replay a recorded feed, one JSON message per line.
+
+    With `interval` set, sleeps that many seconds between laps to mimic a
+    live race; otherwise messages are yielded as fast as they are read.
+    """
+    with open(path) as f:
+        for line in f:
+            message = parse_message(line)
+            if message is None:
+                continue
+            if interval and message.get('type') == 'lap':
+                time.sleep(interval)
+            yield message
+
+
+def read_http_feed(url):
+    """Consume a line-delimited JSON feed streamed over HTTP (e.g. the stand-in server)"""
+    with urllib.request.urlopen(url) as response:
+        for line in response:
+            message = parse_message(line)
+            if message is not None:
+                yield message
+
+
+def open_feed(source, interval=None):
+    """File path or http(s) URL to a message iterator"""
+    if source.startswith('http://') or source.startswith('https://'):
+        return read_http_feed(source)
+    return read_file_feed(source, interval)
+
+
+class LiveRace:
+    """Incrementally updated in-race predictions for the whole field.
+
+    Feed messages:
+      {"type": "start", "drivers": [{"driverId": ..., <predict fields>}, ...]}
+      {"type": "lap", "lap": 12, "updates": [{"driverId": ..., "position": 4}, ...]}
+
+    A lap update may set any model feature directly; `position` is a shortcut
+    that updates PositionsGained from the driver's grid slot, and `lap` sets
+    laps for every driver listed. Only the drivers listed in an update are
+    rewritten and re-scored; everyone else keeps their cached probabilities.
+    A message that fails validation is skipped as a whole and recorded in
+    feed_status(); the feed keeps running.
+    """
+
+    def __init__(self, predictor, lag_window=500):
+        self.predictor = predictor
+        self.feature_index = {name: i for i, name in enumerate(predictor.feature_columns)}
+        self.driver_ids = []
+        self.driver_index = {}
+        self.features = np.empty((0, len(predictor.feature_columns)))
+        self.probabilities = {}
+        self.lap = 0
+        self.lag_ms = deque(maxlen=lag_window)
+        self.subscribers = []
+        self.last_event = None
+        self.feed_running = False
+        self.skipped_messages = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Register a listener; returns a queue receiving one event per lap"""
+        listener = queue.Queue(maxsize=100)
+        with self._lock:
+            self.subscribers.append(listener)
+            if self.last_event is not None:
+                listener.put(self.last_event)
+        return listener
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self.subscribers:
+                self.subscribers.remove(listener)
+
+    def start(self, drivers, received_at=None):
+        """Load the starting grid, score the full field once and publish it as lap 0"""
+        received_at = received_at or time.perf_counter()
+        rows = []
+        for driver in drivers:
+            driver = dict(driver)
+            if 'driverId' not in driver:
+                raise ValueError(f"Starting grid entry without driverId: {driver}")
+            driver.pop('driverId')
+            # prepare_input returns a shared per-thread buffer, so copy it
+            rows.append(self.predictor.prepare_input(driver).copy())
+
+        self.driver_ids = [driver['driverId'] for driver in drivers]
+        self.driver_index = {driver_id: i for i, driver_id in enumerate(self.driver_ids)}
+        self.features = np.vstack(rows) if rows else np.empty((0, len(self.feature_index)))
+        self.probabilities = {target: np.zeros(len(rows)) for target in self.predictor.models}
+        self.lap = 0
+        self._score(np.arange(len(rows)))
+        return self._publish(list(range(len(rows))), received_at)
+
+    def apply_lap(self, message, received_at=None):
+        """Apply one lap's updates, re-score the changed drivers and publish"""
+        received_at = received_at or time.perf_counter()
+        lap = int(self._to_number('lap', message['lap'])) if 'lap' in message else self.lap + 1
+
+        # Convert every value before writing any, so a bad message leaves no driver half-updated
+        changes = []
+        for update in message.get('updates', []):
+            i = self.driver_index.get(update.get('driverId'))
+            if i is None:
+                logger.warning(f"Ignoring update for unknown driver: {update.get('driverId')}")
+                continue
+            values = {
+                self.feature_index[name]: self._to_number(name, value)
+                for name, value in update.items() if name in self.feature_index
+            }
+            if 'position' in update:
+                grid_column = self.feature_index['GridPosition']
+                grid = values.get(grid_column, self.features[i, grid_column])
+                values[self.feature_index['PositionsGained']] = grid - self._to_number('position', update['position'])
+            if 'lap' in message and 'laps' in self.feature_index:
+                values[self.feature_index['laps']] = lap
+            changes.append((i, values))
+
+        self.lap = lap
+        changed = []
+        for i, values in changes:
+            for column, value in values.items():
+                self.features[i, column] = value
+            changed.append(i)
+
+        if changed:
+            self._score(np.unique(changed))
+        return self._publish(changed, received_at)
+
+    @staticmethod
+    def _to_number(name, value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Non-numeric value for {name}: {value!r}")
+        if not np.isfinite(number):
+            raise ValueError(f"Non-finite value for {name}: {value!r}")
+        return number
+
+    def _score(self, rows):
+        if len(rows) == 0:
+            return
+        for target, model in self.predictor.models.items():
+            mean, scale = self.predictor.scaler_params[target]
+            scaled = (self.features[rows] - mean) / scale
+            self.probabilities[target][rows] = model.predict_proba(scaled)[:, 1]
+
+    def _publish(self, changed, received_at):
+        event = {
+            'lap': self.lap,
+            'drivers': self.driver_ids,
+            'changed': [self.driver_ids[i] for i in changed],
+            'predictions': {target: probs.tolist() for target, probs in self.probabilities.items()}
+        }
+        with self._lock:
+            lag = (time.perf_counter() - received_at) * 1000
+            event['lag_ms'] = round(lag, 3)
+            self.lag_ms.append(lag)
+            self.last_event = event
+            for listener in self.subscribers:
+                try:
+                    listener.put_nowait(event)
+                except queue.Full:
+                    # Slow consumer: drop its oldest event rather than stall the feed
+                    listener.get_nowait()
+                    listener.put_nowait(event)
+        return event
+
+    def lag_summary(self):
+        with self._lock:
+            lags = list(self.lag_ms)
+        if not lags:
+            return {'laps': 0}
+        return {
+            'laps': len(lags),
+            'p50_ms': float(np.percentile(lags, 50)),
+            'p95_ms': float(np.percentile(lags, 95)),
+            'max_ms': float(np.max(lags))
+        }
+
+    def feed_status(self):
+        """Whether the feed is still being consumed, and the last message that had to be skipped"""
+        with self._lock:
+            return {
+                'running': self.feed_running,
+                'skipped_messages': self.skipped_messages,
+                'last_error': self.last_error
+            }
+
+    def _record_error(self, message, error):
+        with self._lock:
+            self.skipped_messages += 1
+            self.last_error = {
+                'lap': self.lap,
+                'type': message.get('type') if isinstance(message, dict) else None,
+                'error': f"{type(error).__name__}: {error}"
+            }
+
+    def consume(self, messages):
+        """Drive the race from a feed iterator until it ends; bad messages are logged and skipped"""
+        with self._lock:
+            self.feed_running = True
+        try:
+            for message in messages:
+                received_at = time.perf_counter()
+                try:
+                    if message.get('type') == 'start':
+                        self.start(message['drivers'], received_at)
+                        logger.info(f"Live race started with {len(self.driver_ids)} drivers")
+                    elif message.get('type') == 'lap':
+                        self.apply_lap(message, received_at)
+                except Exception as e:
+                    logger.error(f"Skipping bad feed message after lap {self.lap}: {e}")
+                    self._record_error(message, e)
+            logger.info(f"Live feed ended after lap {self.lap}: {self.lag_summary()}")
+        except Exception as e:
+            # The feed itself failed (e.g. the connection dropped); nothing more will arrive
+            logger.error(f"Live feed failed after lap {self.lap}: {e}")
+            self._record_error(None, e)
+        finally:
+            with self._lock:
+                self.feed_running = False
+
+    def run_in_background(self, source, interval=None):
+        thread = threading.Thread(target=self.consume, args=(open_feed(source, interval),), daemon=True)
+        thread.start()
+        return thread
+
+
+def serve_feed(path, port=8765, interval=1.0):
+    """Local stand-in for a timing provider: streams a recording lap by lap over HTTP"""
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            for message in read_file_feed(path, interval):
+                self.wfile.write((json.dumps(message) + '\n').encode())
+                self.wfile.flush()
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), FeedHandler)
+    print(f"Serving {path} at http://127.0.0.1:{port}/ ({interval}s per lap)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or serve a lap-by-lap race feed")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Stream a recording over HTTP as a stand-in live feed")
+    serve_parser.add_argument('recording')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--interval', type=float, default=1.0, help="Seconds between laps")
+    replay_parser = subparsers.add_parser('replay', help="Score a recording or feed URL and report per-lap lag")
+    replay_parser.add_argument('source')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve_feed(args.recording, args.port, args.interval)
+    else:
+        from race_predictions import F1RacePredictor
+        race = LiveRace(F1RacePredictor())
+        race.consume(open_feed(args.source))
+        print(f"Lag per lap: {race.lag_summary()}")
@@ -8,6 +8,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import joblib
+import argparse
+from src.profiling import profile_stage, enable_profiling
 
 class F1ModelTrainer:
     def __init__(self):
@@ -29,6 +31,7 @@ class F1ModelTrainer:
             if not os.path.exists(dir_path):
                 os.makedirs(dir_path)
 
+    @profile_stage('feature')
     def load_and_clean_data(self):
         # Load data
         data_path = f"{self.data_dir}/f1_processed_data.csv"
@@ -90,6 +93,7 @@ class F1ModelTrainer:
 
         return df_cleaned
 
+    @profile_stage('feature')
     def create_prediction_targets(self, df):
         """Create various prediction targets from the data"""
         return {
@@ -102,6 +106,7 @@ class F1ModelTrainer:
             'Strong Result': ((df['Position'] <= 5) & (df['GridPosition'] > 5)).astype(int)
         }
 
+    @profile_stage('plot')
     def plot_confusion_matrix(self, y_true, y_pred, model_name, target_name):
         plt.figure(figsize=(10, 8))
         cm = confusion_matrix(y_true, y_pred)
@@ -114,6 +119,7 @@ class F1ModelTrainer:
                                  f'{model_name.lower()}_{target_name.lower()}_confusion_matrix.png'))
         plt.close()
 
+    @profile_stage('plot')
     def plot_feature_importance(self, model, feature_columns, target_name):
         if hasattr(model, 'feature_importances_'):
             importance_df = pd.DataFrame({
@@ -133,6 +139,7 @@ class F1ModelTrainer:
 
             return importance_df
 
+    @profile_stage('plot')
     def plot_roc_curve(self, y_test, y_pred_proba, model_name, target_name):
         fpr, tpr, _ = roc_curve(y_test, y_pred_proba)
         roc_auc = auc(fpr, tpr)
@@ -150,6 +157,7 @@ class F1ModelTrainer:
                                  f'{model_name.lower()}_{target_name.lower()}_roc_curve.png'))
         plt.close()
 
+    @profile_stage('plot')
     def plot_precision_recall_curve(self, y_test, y_pred_proba, model_name, target_name):
         precision, recall, _ = precision_recall_curve(y_test, y_pred_proba)
 
@@ -162,6 +170,7 @@ class F1ModelTrainer:
                                  f'{model_name.lower()}_{target_name.lower()}_pr_curve.png'))
         plt.close()
 
+    @profile_stage('plot')
     def plot_feature_distributions(self, X, y, feature_columns, target_name):
         plt.figure(figsize=(15, 10))
         num_features = min(5, len(feature_columns))  # Plot top 5 features
@@ -175,6 +184,7 @@ class F1ModelTrainer:
                                  f'feature_distributions_{target_name.lower()}.png'))
         plt.close()
 
+    @profile_stage('train')
     def train_models(self):
         # Load and prepare data
         df = self.load_and_clean_data()
@@ -276,5 +286,11 @@ class F1ModelTrainer:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and evaluate the race outcome models")
+    parser.add_argument('--profile', action='store_true', help="Profile each stage (same as F1_PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
     trainer = F1ModelTrainer()
     trainer.train_models()
\ No newline at end of file
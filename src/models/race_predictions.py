@@ -1,8 +1,7 @@
-import pandas as pd
 import numpy as np
-import joblib
 import os
 import logging
+import threading
 import warnings
 
 # Suppress specific warnings
@@ -15,6 +14,10 @@ logger = logging.getLogger(__name__)
 
 
 class F1RacePredictor:
+    # Features that /api/sweep may vary, and the largest grid it will evaluate
+    SWEEP_AXES = ['GridPosition', 'raceName_encoded', 'Constructor_encoded', 'year', 'round']
+    MAX_SWEEP_POINTS = 2000
+
     def __init__(self):
         logger.info("Initializing F1RacePredictor")
         self.setup_paths()
@@ -53,8 +56,8 @@ class F1RacePredictor:
                 'Top 5': 'top 5_scaler.joblib'
             }
 
-            # Explicitly import numpy to ensure compatibility
-            import numpy
+            # Deferred so importing this module does not pull in joblib/sklearn
+            import joblib
 
             # Load models
             self.models = {}
@@ -101,6 +104,17 @@ class F1RacePredictor:
                 logger.error(f"Error loading feature info: {e}")
                 raise
 
+            # Column order and scaler parameters for the pandas-free serving path
+            self.feature_columns = self.feature_info['feature_columns']
+            self.scaler_params = {
+                name: (scaler.mean_, scaler.scale_) for name, scaler in self.scalers.items()
+            }
+            self._buffers = threading.local()
+
+            # TreeSHAP path tables are only built once explain is first requested
+            self.attributors = None
+            self._attributors_lock = threading.Lock()
+
             logger.info("All models and scalers loaded successfully!")
 
         except Exception as e:
@@ -131,30 +145,49 @@ class F1RacePredictor:
 
         return True
 
+    def _row_buffers(self):
+        """Per-thread preallocated (1, n_features) arrays for the raw and scaled input row"""
+        if not hasattr(self._buffers, 'row'):
+            n_features = len(self.feature_columns)
+            self._buffers.row = np.empty((1, n_features))
+            self._buffers.scaled = np.empty((1, n_features))
+        return self._buffers.row, self._buffers.scaled
+
+    def prepare_input(self, input_data):
+        """Validate input and write it into the preallocated row in model column order"""
+        # Validate input
+        self.validate_input(input_data)
+
+        # Add BestQualiTime if not present
+        if 'BestQualiTime' not in input_data:
+            quali_times = [input_data[f'Q{i}_seconds'] for i in range(1, 4) if input_data[f'Q{i}_seconds'] > 0]
+            input_data['BestQualiTime'] = min(quali_times) if quali_times else input_data['Q1_seconds']
+
+        row, _ = self._row_buffers()
+        for i, column in enumerate(self.feature_columns):
+            row[0, i] = input_data[column]
+        return row
+
+    def scale_input(self, target, row):
+        """Equivalent of scaler.transform(row) without sklearn's per-call validation"""
+        mean, scale = self.scaler_params[target]
+        _, scaled = self._row_buffers()
+        np.subtract(row, mean, out=scaled)
+        np.divide(scaled, scale, out=scaled)
+        return scaled
+
     def make_predictions(self, input_data):
         """Make predictions using all models"""
         try:
-            # Validate input
-            self.validate_input(input_data)
-
-            # Add BestQualiTime if not present
-            if 'BestQualiTime' not in input_data:
-                quali_times = [input_data[f'Q{i}_seconds'] for i in range(1, 4) if input_data[f'Q{i}_seconds'] > 0]
-                input_data['BestQualiTime'] = min(quali_times) if quali_times else input_data['Q1_seconds']
-
-            # Convert input to DataFrame
-            input_df = pd.DataFrame([input_data])
+            row = self.prepare_input(input_data)
 
-            # Ensure columns are in correct order
-            input_df = input_df[self.feature_info['feature_columns']]
-
-            logger.info(f"Input data processed: {input_df.to_dict('records')[0]}")
+            logger.info("Input data processed: %s", input_data)
 
             predictions = {}
             for target, model in self.models.items():
                 try:
                     # Scale input data
-                    scaled_input = self.scalers[target].transform(input_df)
+                    scaled_input = self.scale_input(target, row)
 
                     # Get prediction probability
                     prob = model.predict_proba(scaled_input)[0][1]
@@ -164,13 +197,101 @@ class F1RacePredictor:
                     logger.error(f"Error predicting {target}: {str(e)}")
                     predictions[target] = None
 
-            logger.info(f"Generated predictions: {predictions}")
+            logger.info("Generated predictions: %s", predictions)
             return predictions
 
         except Exception as e:
             logger.error(f"Error in make_predictions: {str(e)}")
             raise
 
+    def get_attributors(self):
+        """Per-target F1FeatureAttributor, compiled on first use"""
+        with self._attributors_lock:
+            if self.attributors is None:
+                # Package import under gunicorn/tests, sibling import when run from src/models
+                try:
+                    from .feature_attribution import F1FeatureAttributor
+                except ImportError:
+                    from feature_attribution import F1FeatureAttributor
+                self.attributors = {
+                    name: F1FeatureAttributor(model, self.feature_columns)
+                    for name, model in self.models.items()
+                }
+        return self.attributors
+
+    def explain_predictions(self, input_data):
+        """Per-feature TreeSHAP contributions to each target's predicted probability"""
+        try:
+            row = self.prepare_input(input_data)
+
+            attributions = {}
+            for target, attributor in self.get_attributors().items():
+                scaled_input = self.scale_input(target, row)
+                base_value, contributions = attributor.explain(scaled_input)
+                attributions[target] = {
+                    'base_value': float(base_value),
+                    'contributions': {
+                        feature: float(value) for feature, value in zip(self.feature_columns, contributions[0])
+                    }
+                }
+
+            return attributions
+
+        except Exception as e:
+            logger.error(f"Error in explain_predictions: {str(e)}")
+            raise
+
+    def sweep_predictions(self, base_input, axes):
+        """Predict every target over the Cartesian product of `axes` applied to `base_input`.
+
+        `axes` maps a feature in SWEEP_AXES to the list of values to try, e.g.
+        {'GridPosition': [1, ..., 20], 'raceName_encoded': [3, 7]}. Returns
+        columnar JSON: the axis names and values, and per target a flat list of
+        probabilities in row-major order over the axes (last axis varies fastest).
+        """
+        try:
+            if not axes:
+                raise ValueError("At least one sweep axis is required")
+            invalid_axes = [name for name in axes if name not in self.SWEEP_AXES]
+            if invalid_axes:
+                raise ValueError(f"Cannot sweep {invalid_axes}; allowed axes: {self.SWEEP_AXES}")
+
+            axis_names = list(axes)
+            axis_values = [list(axes[name]) for name in axis_names]
+            n_points = int(np.prod([len(values) for values in axis_values]))
+            if n_points == 0:
+                raise ValueError("Sweep axes must not be empty")
+            if n_points > self.MAX_SWEEP_POINTS:
+                raise ValueError(f"Sweep has {n_points} points; the limit is {self.MAX_SWEEP_POINTS}")
+
+            # Each axis value must be valid on its own, with the rest of the base input
+            for name, values in zip(axis_names, axis_values):
+                for value in values:
+                    self.validate_input({**base_input, name: value})
+            base_row = self.prepare_input(base_input)
+
+            # One matrix for the whole grid: base row repeated, swept columns overwritten
+            matrix = np.repeat(base_row, n_points, axis=0)
+            grids = np.meshgrid(*[np.asarray(values, dtype=np.float64) for values in axis_values], indexing='ij')
+            for name, grid in zip(axis_names, grids):
+                matrix[:, self.feature_columns.index(name)] = grid.ravel()
+
+            predictions = {}
+            for target, model in self.models.items():
+                mean, scale = self.scaler_params[target]
+                predictions[target] = model.predict_proba((matrix - mean) / scale)[:, 1].tolist()
+
+            logger.info("Generated sweep over %s (%d points)", axis_names, n_points)
+            return {
+                'axes': axis_names,
+                'values': dict(zip(axis_names, axis_values)),
+                'predictions': predictions
+            }
+
+        except Exception as e:
+            logger.error(f"Error in sweep_predictions: {str(e)}")
+            raise
+
 
 if __name__ == "__main__":
     predictor = F1RacePredictor()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from src.profiling import DEFAULT_PROFILE_DIR, PROFILE_DIR_ENV, PROFILE_RUN_ID_ENV
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_COLLECTION_DIR = os.path.join(PROJECT_ROOT, 'src', 'data_collection')
+CSV_DIR = os.path.join(DATA_COLLECTION_DIR, 'data', 'csv')
+MODELS_DIR = os.path.join(PROJECT_ROOT, 'src', 'models')
+STATE_FILE = os.path.join(PROJECT_ROOT, '.pipeline', 'state.json')
+PROFILING_MODULE = os.path.join(PROJECT_ROOT, 'src', 'profiling.py')
+
+
+class PipelineStage:
+    """One pipeline step: a script run in `cwd` that turns `inputs` into `outputs`.
+
+    `code` lists the source files whose contents are part of the fingerprint:
+    the script and every repo module it imports (defaults to the script alone).
+    `params` are the command line arguments that change the stage's result.
+    `freshness` is an extra fingerprint value that is not passed to the script,
+    for stages whose result depends on something outside the tree (e.g. an API).
+    Inputs and outputs may be files or directories.
+    """
+
+    def __init__(self, name, script, cwd, inputs=(), outputs=(), code=(), params=None, freshness=None):
+        self.name = name
+        self.script = script
+        self.cwd = cwd
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code) or [os.path.join(cwd, script)]
+        self.params = params or {}
+        self.freshness = freshness
+
+    def command(self, profile=False):
+        args = [sys.executable, self.script]
+        for key, value in self.params.items():
+            args += [f"--{key.replace('_', '-')}", str(value)]
+        if profile:
+            args.append('--profile')
+        return args
+
+
+def build_stages(start_year=None, end_year=None):
+    """The bronze -> silver -> gold/model stages of this project.
+
+    While the collected range includes the current season new rounds can appear
+    on the API at any time, so collect is keyed on today's date and reruns at
+    most once a day; completed seasons are only collected again with --force.
+    """
+    today = datetime.now().date()
+    end_year = end_year or today.year
+    start_year = start_year or end_year - 40
+
+    bronze = [os.path.join(CSV_DIR, 'race_bronze_df.csv'),
+              os.path.join(CSV_DIR, 'qualifying_bronze_df.csv')]
+    silver = [os.path.join(CSV_DIR, 'f1_processed_data.csv')]
+    history_db = os.path.join(CSV_DIR, 'f1_history.db')
+
+    return [
+        PipelineStage(
+            name='collect',
+            script='api_collector.py',
+            cwd=DATA_COLLECTION_DIR,
+            outputs=bronze,
+            code=[os.path.join(DATA_COLLECTION_DIR, 'api_collector.py'), PROFILING_MODULE],
+            params={'start_year': start_year, 'end_year': end_year},
+            freshness=today.isoformat() if end_year >= today.year else None
+        ),
+        PipelineStage(
+            name='silver',
+            script='silver_processor.py',
+            cwd=DATA_COLLECTION_DIR,
+            inputs=bronze,
+            outputs=silver + [history_db],
+            code=[os.path.join(DATA_COLLECTION_DIR, 'silver_processor.py'),
+                  os.path.join(DATA_COLLECTION_DIR, 'race_store.py'),
+                  PROFILING_MODULE]
+        ),
+        PipelineStage(
+            name='train',
+            script='model_trainer.py',
+            cwd=MODELS_DIR,
+            inputs=silver,
+            outputs=[os.path.join(MODELS_DIR, 'output')],
+            code=[os.path.join(MODELS_DIR, 'model_trainer.py'), PROFILING_MODULE]
+        ),
+    ]
+
+
+class F1Pipeline:
+    """Runs stages in dependency order, skipping those whose fingerprint is unchanged.
+
+    A stage's fingerprint covers its code, parameters and the content of its
+    inputs. File hashes are cached by (size, mtime) in the state file so an
+    unchanged tree is checked without rereading any data. Stages that do not
+    depend on each other run concurrently.
+    """
+
+    def __init__(self, stages, state_file=STATE_FILE, jobs=2, force=False, profile=False):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.jobs = jobs
+        self.force = force
+        self.profile = profile
+        self.profile_dir = None
+        self._lock = threading.Lock()
+        self.state = self.load_state()
+
+        # A stage depends on every stage that produces one of its inputs
+        producers = {}
+        for stage in stages:
+            for path in stage.outputs:
+                producers[os.path.abspath(path)] = stage.name
+        self.dependencies = {
+            stage.name: {producers[os.path.abspath(path)] for path in stage.inputs
+                         if os.path.abspath(path) in producers} - {stage.name}
+            for stage in stages
+        }
+
+    def load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                return json.load(f)
+        return {'files': {}, 'stages': {}}
+
+    def save_state(self):
+        state_dir = os.path.dirname(self.state_file)
+        if not os.path.exists(state_dir):
+            os.makedirs(state_dir)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.state_file)
+
+    def hash_file(self, path):
+        """sha256 of a file's content, reused while its size and mtime are unchanged"""
+        stat = os.stat(path)
+        key = os.path.relpath(path, PROJECT_ROOT)
+        with self._lock:
+            cached = self.state['files'].get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with self._lock:
+            self.state['files'][key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def hash_path(self, path):
+        """Hash of a file, a directory tree, or None if the path does not exist"""
+        if os.path.isfile(path):
+            return self.hash_file(path)
+        if not os.path.isdir(path):
+            return None
+
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                file_path = os.path.join(root, filename)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self.hash_file(file_path).encode())
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        digest = hashlib.sha256()
+        digest.update(stage.name.encode())
+        digest.update(json.dumps(stage.params, sort_keys=True).encode())
+        digest.update(str(stage.freshness).encode())
+        for path in stage.code + stage.inputs:
+            digest.update(os.path.relpath(path, PROJECT_ROOT).encode())
+            digest.update(str(self.hash_path(path)).encode())
+        return digest.hexdigest()
+
+    def output_hashes(self, stage):
+        return {os.path.relpath(path, PROJECT_ROOT): self.hash_path(path) for path in stage.outputs}
+
+    def is_up_to_date(self, stage, fingerprint):
+        """Unchanged fingerprint and outputs still exactly as the last run left them"""
+        with self._lock:
+            recorded = self.state['stages'].get(stage.name)
+        if self.force or not recorded or recorded['fingerprint'] != fingerprint:
+            return False
+        outputs = self.output_hashes(stage)
+        return None not in outputs.values() and outputs == recorded['outputs']
+
+    def run_stage(self, name):
+        """Run one stage unless it is up to date; returns True if it was executed"""
+        stage = self.stages[name]
+        fingerprint = self.fingerprint(stage)
+        if self.is_up_to_date(stage, fingerprint):
+            print(f"[{name}] up to date, skipping")
+            return False
+
+        print(f"[{name}] running {' '.join(stage.command(self.profile))} in {stage.cwd}")
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')]))
+        if self.profile:
+            # One directory per pipeline run, with a subdirectory per stage
+            env[PROFILE_DIR_ENV] = self.profile_dir
+            env[PROFILE_RUN_ID_ENV] = name
+        start = time.time()
+        result = subprocess.run(stage.command(self.profile), cwd=stage.cwd, env=env)
+        if result.returncode != 0:
+            raise RuntimeError(f"Stage {name} failed with exit code {result.returncode}")
+
+        outputs = self.output_hashes(stage)
+        missing = [path for path, digest in outputs.items() if digest is None]
+        if missing:
+            raise RuntimeError(f"Stage {name} did not produce: {missing}")
+
+        with self._lock:
+            self.state['stages'][name] = {
+                'fingerprint': fingerprint,
+                'outputs': outputs,
+                'completed_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self.save_state()
+        print(f"[{name}] finished in {time.time() - start:.1f}s")
+        return True
+
+    def run(self, targets=None):
+        """Run `targets` (default: all stages); upstream stages are only run if listed"""
+        selected = set(targets or self.stages)
+        unknown = selected - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+        if self.profile:
+            self.profile_dir = os.path.join(os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR),
+                                            f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        pending = {name: self.dependencies[name] & selected for name in selected}
+        executed = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            running = {}
+            while pending or running:
+                for name in [name for name, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[executor.submit(self.run_stage, name)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.result():
+                        executed.append(name)
+                    for deps in pending.values():
+                        deps.discard(name)
+
+        with self._lock:
+            self.save_state()
+        return executed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bronze -> silver -> model pipeline, skipping unchanged stages")
+    parser.add_argument('stages', nargs='*', help="Stages to run (default: all of collect, silver, train)")
+    parser.add_argument('--force', action='store_true', help="Rerun stages even if their fingerprint is unchanged")
+    parser.add_argument('--jobs', type=int, default=2, help="Maximum number of stages to run concurrently")
+    parser.add_argument('--profile', action='store_true', help="Pass --profile to every stage")
+    parser.add_argument('--start-year', type=int, default=None, help="First season to collect")
+    parser.add_argument('--end-year', type=int, default=None, help="Last season to collect")
+    args = parser.parse_args()
+
+    pipeline = F1Pipeline(build_stages(args.start_year, args.end_year),
+                          jobs=args.jobs, force=args.force, profile=args.profile)
+    start = time.time()
+    executed = pipeline.run(args.stages)
+    print(f"Pipeline finished in {time.time() - start:.1f}s; ran: {', '.join(executed) or 'nothing'}")
+    if pipeline.profile_dir and executed:
+        print(f"Stage profiles written to {pipeline.profile_dir}")
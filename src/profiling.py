@@ -0,0 +1,157 @@
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+# Profiling is off unless F1_PROFILE is set (or enable_profiling() is called,
+# e.g. from a script's --profile flag). When off, the decorators below cost a
+# single attribute check per call.
+PROFILE_ENV = 'F1_PROFILE'
+PROFILE_DIR_ENV = 'F1_PROFILE_DIR'
+PROFILE_TOP_ENV = 'F1_PROFILE_TOP'
+PROFILE_REQUEST_RATE_ENV = 'F1_PROFILE_REQUEST_RATE'
+PROFILE_RUN_ID_ENV = 'F1_PROFILE_RUN_ID'
+
+# Anchored to the repo root so scripts run from different directories share it
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'profiles')
+
+
+class F1Profiler:
+    """cProfile wrapper for pipeline stages and sampled API requests.
+
+    Each run writes to <output_dir>/<run_id>/ (run_id defaults to a timestamp
+    and pid, or F1_PROFILE_RUN_ID when a parent process picks it): one .prof file per stage or
+    sampled request (loadable with pstats or snakeviz), a matching .txt with
+    the top-N functions by cumulative time, summary.txt with calls and
+    exclusive wall time per stage, and requests.txt with wall time per
+    sampled request.
+    Nested stages are profiled exclusively: the outer stage's profiler is
+    paused while an inner stage runs, and the inner stage's wall time is
+    subtracted from the outer one, so plot time is not counted as train.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get(PROFILE_ENV, '').lower() not in ('', '0', 'false', 'no')
+        self.output_dir = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+        self.top_n = int(os.environ.get(PROFILE_TOP_ENV, 25))
+        self.request_rate = float(os.environ.get(PROFILE_REQUEST_RATE_ENV, 0.1))
+        self.run_id = os.environ.get(PROFILE_RUN_ID_ENV) or None
+        self._local = threading.local()
+
+    def enable(self, output_dir=None, request_rate=None):
+        """Turn profiling on for the rest of this process"""
+        self.enabled = True
+        if output_dir is not None:
+            self.output_dir = output_dir
+        if request_rate is not None:
+            self.request_rate = request_rate
+
+    @property
+    def run_dir(self):
+        if self.run_id is None:
+            self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        path = os.path.join(self.output_dir, self.run_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _state(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+            self._local.profiles = {}
+            self._local.timings = {}
+            self._local.dirty = set()
+        return self._local
+
+    def stage(self, name):
+        """Decorator profiling every call of the wrapped function as pipeline stage `name`"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                return self._run_stage(name, func, args, kwargs)
+            return wrapper
+        return decorator
+
+    def request(self, name):
+        """Decorator profiling a sampled fraction of calls, each into its own file"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or random.random() >= self.request_rate:
+                    return func(*args, **kwargs)
+                stage_name = f"{name}_{datetime.now().strftime('%H%M%S_%f')}"
+                return self._run_stage(stage_name, func, args, kwargs, per_call=True)
+            return wrapper
+        return decorator
+
+    def _run_stage(self, name, func, args, kwargs, per_call=False):
+        state = self._state()
+        profile = state.profiles.setdefault(name, cProfile.Profile())
+
+        # Stack frames are [profile, seconds spent in nested stages]
+        if state.stack:
+            state.stack[-1][0].disable()
+        frame = [profile, 0.0]
+        state.stack.append(frame)
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            total_elapsed = time.perf_counter() - start
+            # Exclusive time, matching the .prof files which exclude nested stages
+            elapsed = total_elapsed - frame[1]
+            state.stack.pop()
+            if state.stack:
+                state.stack[-1][1] += total_elapsed
+                state.stack[-1][0].enable()
+
+            if per_call:
+                self._dump(name, profile)
+                self._append_line('requests.txt', f"{name}\t{elapsed:.4f}s\n")
+                del state.profiles[name]
+            else:
+                calls, total = state.timings.get(name, (0, 0.0))
+                state.timings[name] = (calls + 1, total + elapsed)
+                state.dirty.add(name)
+                if not state.stack:
+                    for dirty_name in state.dirty:
+                        self._dump(dirty_name, state.profiles[dirty_name])
+                    state.dirty.clear()
+                    self._write_stage_summary(state)
+
+    def _dump(self, name, profile):
+        """Write a .prof file and a top-N text report for one profile"""
+        safe_name = name.replace(' ', '_').replace(os.sep, '_')
+        profile.dump_stats(os.path.join(self.run_dir, f"{safe_name}.prof"))
+        with open(os.path.join(self.run_dir, f"{safe_name}.txt"), 'w') as f:
+            stats = pstats.Stats(profile, stream=f)
+            stats.sort_stats('cumulative').print_stats(self.top_n)
+
+    def _write_stage_summary(self, state):
+        summary_path = os.path.join(self.run_dir, 'summary.txt')
+        with open(summary_path, 'w') as f:
+            f.write("stage\tcalls\texclusive_seconds\n")
+            for name, (calls, total) in state.timings.items():
+                f.write(f"{name}\t{calls}\t{total:.3f}\n")
+        print(f"Wrote stage profiles to {self.run_dir}")
+
+    def _append_line(self, filename, line):
+        with open(os.path.join(self.run_dir, filename), 'a') as f:
+            f.write(line)
+
+
+profiler = F1Profiler()
+profile_stage = profiler.stage
+profile_request = profiler.request
+
+
+def enable_profiling(output_dir=None, request_rate=None):
+    """Enable profiling programmatically, e.g. from a --profile command line flag"""
+    profiler.enable(output_dir, request_rate)
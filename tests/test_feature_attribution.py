@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+
+from src.models.feature_attribution import F1FeatureAttributor
+
+FEATURES = [f'f{i}' for i in range(6)]
+
+
+@pytest.fixture(scope='module')
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, len(FEATURES)))
+    y = ((X[:, 0] + 0.5 * X[:, 1] * X[:, 2] - X[:, 3]) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def random_forest(training_data):
+    X, y = training_data
+    return RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def hist_gradient_boosting(training_data):
+    X, y = training_data
+    return HistGradientBoostingClassifier(max_iter=20, max_depth=4, random_state=0).fit(X, y)
+
+
+def test_random_forest_attributions_add_up_to_probability(random_forest, training_data):
+    X = training_data[0][:50]
+    base_value, contributions = F1FeatureAttributor(random_forest, FEATURES).explain(X)
+
+    assert contributions.shape == (50, len(FEATURES))
+    np.testing.assert_allclose(base_value + contributions.sum(axis=1),
+                               random_forest.predict_proba(X)[:, 1], atol=1e-10)
+
+
+def test_hist_gradient_boosting_attributions_add_up_to_log_odds(hist_gradient_boosting, training_data):
+    X = training_data[0][:50].copy()
+    X[0, 1] = np.nan
+    base_value, contributions = F1FeatureAttributor(hist_gradient_boosting, FEATURES).explain(X)
+
+    np.testing.assert_allclose(base_value + contributions.sum(axis=1),
+                               hist_gradient_boosting.decision_function(X), atol=1e-10)
+
+
+def test_lookup_tables_match_direct_evaluation(random_forest, training_data, monkeypatch):
+    X = training_data[0][:20]
+    _, with_tables = F1FeatureAttributor(random_forest, FEATURES).explain(X)
+    monkeypatch.setattr(F1FeatureAttributor, 'max_table_depth', 0)
+    _, without_tables = F1FeatureAttributor(random_forest, FEATURES).explain(X)
+
+    np.testing.assert_allclose(with_tables, without_tables, atol=1e-12)
+
+
+@pytest.mark.parametrize('model_name', ['random_forest', 'hist_gradient_boosting'])
+def test_matches_shap_tree_explainer(model_name, training_data, request):
+    shap = pytest.importorskip('shap')
+    model = request.getfixturevalue(model_name)
+    X = training_data[0][:30]
+
+    _, contributions = F1FeatureAttributor(model, FEATURES).explain(X)
+    expected = shap.TreeExplainer(model, feature_perturbation='tree_path_dependent').shap_values(X)
+    if isinstance(expected, list):
+        expected = expected[1]
+    elif np.ndim(expected) == 3:
+        expected = expected[..., 1]
+
+    np.testing.assert_allclose(contributions, expected, atol=1e-10)
+
+
+def test_rejects_unsupported_models():
+    with pytest.raises(ValueError):
+        F1FeatureAttributor(object(), FEATURES)
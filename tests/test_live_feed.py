@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.models.live_feed import LiveRace, read_file_feed
+
+FEATURES = ['GridPosition', 'PositionsGained', 'laps']
+
+
+class RecordingModel:
+    """Probability 1 / GridPosition; remembers how many rows each call scored"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, X):
+        self.batch_sizes.append(len(X))
+        positive = 1 / X[:, 0]
+        return np.column_stack([1 - positive, positive])
+
+
+class StubPredictor:
+    feature_columns = FEATURES
+
+    def __init__(self):
+        self.models = {'Race Winner': RecordingModel()}
+        self.scaler_params = {'Race Winner': (np.zeros(len(FEATURES)), np.ones(len(FEATURES)))}
+
+    def prepare_input(self, data):
+        return np.array([[float(data[column]) for column in FEATURES]])
+
+
+def grid(n=4):
+    return [{'driverId': f'd{i}', 'GridPosition': i + 1, 'PositionsGained': 0, 'laps': 0} for i in range(n)]
+
+
+@pytest.fixture
+def race():
+    race = LiveRace(StubPredictor())
+    race.start(grid())
+    return race
+
+
+def test_start_publishes_the_grid_as_lap_zero():
+    race = LiveRace(StubPredictor())
+    listener = race.subscribe()
+    race.start(grid())
+
+    event = listener.get_nowait()
+    assert event['lap'] == 0
+    assert event['changed'] == ['d0', 'd1', 'd2', 'd3']
+    assert event['predictions']['Race Winner'] == pytest.approx([1, 1 / 2, 1 / 3, 1 / 4])
+    assert race.last_event is event
+
+
+def test_only_listed_drivers_are_rescored(race):
+    model = race.predictor.models['Race Winner']
+    before = race.probabilities['Race Winner'].copy()
+
+    event = race.apply_lap({'lap': 1, 'updates': [{'driverId': 'd2', 'GridPosition': 1}]})
+
+    assert model.batch_sizes[-1] == 1
+    assert event['changed'] == ['d2']
+    after = race.probabilities['Race Winner']
+    assert after[2] == pytest.approx(1.0)
+    np.testing.assert_array_equal(np.delete(after, 2), np.delete(before, 2))
+
+
+def test_position_sets_positions_gained_from_the_grid_slot(race):
+    race.apply_lap({'lap': 5, 'updates': [{'driverId': 'd3', 'position': 1}, {'driverId': 'd0', 'position': 3}]})
+
+    assert race.features[3, FEATURES.index('PositionsGained')] == 4 - 1
+    assert race.features[0, FEATURES.index('PositionsGained')] == 1 - 3
+    assert race.features[3, FEATURES.index('laps')] == 5
+    assert race.features[1, FEATURES.index('laps')] == 0
+
+
+def test_full_subscriber_queue_drops_its_oldest_event(race):
+    listener = race.subscribe()
+    # subscribe() replays the lap 0 event, leaving room for maxsize - 1 laps
+    for lap in range(1, listener.maxsize + 2):
+        race.apply_lap({'lap': lap, 'updates': []})
+
+    laps = [listener.get_nowait()['lap'] for _ in range(listener.qsize())]
+    assert len(laps) == listener.maxsize
+    assert laps[0] == 2
+    assert laps[-1] == listener.maxsize + 1
+
+
+def test_bad_update_is_rejected_without_partial_writes(race):
+    features = race.features.copy()
+
+    with pytest.raises(ValueError):
+        race.apply_lap({'lap': 1, 'updates': [{'driverId': 'd1', 'position': 1}, {'driverId': 'd0', 'position': 'P3'}]})
+
+    np.testing.assert_array_equal(race.features, features)
+    assert race.lap == 0
+
+
+def test_consume_skips_bad_messages_and_reports_them(tmp_path):
+    feed = tmp_path / 'feed.jsonl'
+    messages = [
+        {'type': 'start'},
+        {'type': 'start', 'drivers': grid()},
+        {'type': 'lap', 'lap': 1, 'updates': [{'driverId': 'd0', 'position': 'P3'}]},
+    ]
+    feed.write_text('\n'.join(json.dumps(message) for message in messages) + '\nnot json\n'
+                    + json.dumps({'type': 'lap', 'lap': 2, 'updates': [{'driverId': 'd1', 'position': 1}]}) + '\n')
+
+    race = LiveRace(StubPredictor())
+    race.consume(read_file_feed(str(feed)))
+
+    assert race.last_event['lap'] == 2
+    assert race.last_event['changed'] == ['d1']
+    status = race.feed_status()
+    assert status['running'] is False
+    assert status['skipped_messages'] == 2
+    assert 'P3' in status['last_error']['error']
@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pytest
+
+from src.pipeline import F1Pipeline, PipelineStage, build_stages
+
+# Appends one line per run to runs.log so tests can count executions
+COPY_SCRIPT = """import sys
+with open(sys.argv[1]) as src, open(sys.argv[2], 'w') as dst:
+    dst.write(src.read().upper())
+with open('runs.log', 'a') as log:
+    log.write(sys.argv[2] + '\\n')
+"""
+
+
+class CopyStage(PipelineStage):
+    def command(self, profile=False):
+        return super().command(profile) + [self.inputs[0], self.outputs[0]]
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / 'copy.py').write_text(COPY_SCRIPT)
+    (tmp_path / 'raw.txt').write_text('bronze')
+    return tmp_path
+
+
+def make_pipeline(workspace, **kwargs):
+    path = lambda name: str(workspace / name)
+    stages = [
+        CopyStage('silver', 'copy.py', str(workspace), inputs=[path('raw.txt')], outputs=[path('silver.txt')]),
+        CopyStage('gold', 'copy.py', str(workspace), inputs=[path('silver.txt')], outputs=[path('gold.txt')]),
+    ]
+    return F1Pipeline(stages, state_file=path('.pipeline/state.json'), **kwargs)
+
+
+def run_count(workspace):
+    return len((workspace / 'runs.log').read_text().splitlines())
+
+
+def test_unchanged_rerun_is_a_no_op(workspace):
+    assert make_pipeline(workspace).run() == ['silver', 'gold']
+    assert (workspace / 'gold.txt').read_text() == 'BRONZE'
+
+    assert make_pipeline(workspace).run() == []
+    assert run_count(workspace) == 2
+
+
+def test_changed_input_reruns_downstream_stages(workspace):
+    make_pipeline(workspace).run()
+    (workspace / 'raw.txt').write_text('new bronze')
+
+    assert make_pipeline(workspace).run() == ['silver', 'gold']
+    assert (workspace / 'gold.txt').read_text() == 'NEW BRONZE'
+
+
+def test_modified_output_is_rebuilt(workspace):
+    make_pipeline(workspace).run()
+    (workspace / 'gold.txt').write_text('edited by hand')
+
+    assert make_pipeline(workspace).run() == ['gold']
+
+
+def test_force_reruns_everything(workspace):
+    make_pipeline(workspace).run()
+    assert make_pipeline(workspace, force=True).run(['gold']) == ['gold']
+
+
+def test_collect_is_refreshed_only_for_the_current_season():
+    current = {stage.name: stage for stage in build_stages()}
+    finished = {stage.name: stage for stage in build_stages(2000, 2010)}
+
+    assert current['collect'].freshness is not None
+    assert finished['collect'].freshness is None
+    assert '--end-year' in current['collect'].command()
+    assert current['collect'].freshness not in current['collect'].command()
+
+
+def test_stage_code_covers_imported_repo_modules():
+    for stage in build_stages():
+        assert os.path.join(stage.cwd, stage.script) in stage.code
+        assert all(os.path.isfile(path) for path in stage.code)
+        assert any(path.endswith(os.path.join('src', 'profiling.py')) for path in stage.code)
+
+
+def test_silver_fingerprints_the_race_store():
+    silver = {stage.name: stage for stage in build_stages()}['silver']
+    assert os.path.join(silver.cwd, 'race_store.py') in silver.code
+
+
+ENV_SCRIPT = """import os, sys
+with open(sys.argv[1], 'w') as f:
+    f.write(os.environ.get('F1_PROFILE_DIR', '') + '\\n' + os.environ.get('F1_PROFILE_RUN_ID', ''))
+"""
+
+
+class EnvStage(PipelineStage):
+    def command(self, profile=False):
+        return [sys.executable, self.script, self.outputs[0]]
+
+
+def test_profiled_stages_share_one_run_directory(workspace, monkeypatch):
+    monkeypatch.setenv('F1_PROFILE_DIR', str(workspace / 'profiles'))
+    (workspace / 'env.py').write_text(ENV_SCRIPT)
+    stages = [EnvStage(name, 'env.py', str(workspace), outputs=[str(workspace / f'{name}.env')])
+              for name in ('silver', 'train')]
+    pipeline = F1Pipeline(stages, state_file=str(workspace / 'state.json'), profile=True)
+    pipeline.run()
+
+    for name in ('silver', 'train'):
+        profile_dir, run_id = (workspace / f'{name}.env').read_text().splitlines()
+        assert profile_dir == pipeline.profile_dir
+        assert run_id == name
+    assert os.path.dirname(pipeline.profile_dir) == str(workspace / 'profiles')
@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.models.race_predictions import F1RacePredictor
+
+FEATURES = ['GridPosition', 'PositionsGained', 'Q1_seconds', 'Q2_seconds', 'Q3_seconds', 'BestQualiTime',
+            'year', 'round', 'Points', 'laps', 'Constructor_encoded', 'raceName_encoded']
+
+
+def make_predictor(models):
+    """F1RacePredictor with in-memory models and identity scalers instead of the joblib files"""
+    predictor = F1RacePredictor.__new__(F1RacePredictor)
+    predictor.models = models
+    predictor.feature_columns = FEATURES
+    predictor.scaler_params = {name: (np.zeros(len(FEATURES)), np.ones(len(FEATURES))) for name in models}
+    predictor._buffers = threading.local()
+    predictor.attributors = None
+    predictor._attributors_lock = threading.Lock()
+    return predictor
+
+
+def race_input(**overrides):
+    data = {
+        'GridPosition': 5, 'Q1_seconds': 80.1, 'Q2_seconds': 79.5, 'Q3_seconds': 79.0,
+        'year': 2024, 'round': 3, 'laps': 57, 'Constructor_encoded': 2, 'raceName_encoded': 7,
+        'Points': 12, 'TeamSeasonPoints': 40, 'TeamAvgPoints': 8, 'RecentAvgPosition': 6,
+        'PositionsGained': 0
+    }
+    data.update(overrides)
+    return data
+
+
+def test_attributors_load_through_the_package_import():
+    pytest.importorskip('sklearn')
+    from sklearn.ensemble import RandomForestClassifier
+    from src.models.feature_attribution import F1FeatureAttributor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(FEATURES)))
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, X[:, 0] > 0)
+    predictor = make_predictor({'Race Winner': model})
+
+    assert isinstance(predictor.get_attributors()['Race Winner'], F1FeatureAttributor)
+    explained = predictor.explain_predictions(race_input())['Race Winner']
+    probability = predictor.make_predictions(race_input())['Race Winner']
+    assert explained['base_value'] + sum(explained['contributions'].values()) == pytest.approx(probability)
+
+
+class StubModel:
+    """predict_proba encodes the grid slot and track of each row so outputs can be traced back to inputs"""
+
+    def predict_proba(self, X):
+        grid = X[:, FEATURES.index('GridPosition')]
+        track = X[:, FEATURES.index('raceName_encoded')]
+        positive = grid / 100 + track / 10000
+        return np.column_stack([1 - positive, positive])
+
+
+def test_sweep_is_row_major_with_last_axis_fastest():
+    predictor = make_predictor({'Race Winner': StubModel()})
+    axes = {'GridPosition': [1, 5, 20], 'raceName_encoded': [0, 13]}
+    result = predictor.sweep_predictions(race_input(), axes)
+
+    assert result['axes'] == ['GridPosition', 'raceName_encoded']
+    assert result['values'] == axes
+    flat = result['predictions']['Race Winner']
+    assert len(flat) == 6
+    for i, grid in enumerate(axes['GridPosition']):
+        for j, track in enumerate(axes['raceName_encoded']):
+            single = predictor.make_predictions(race_input(GridPosition=grid, raceName_encoded=track))
+            assert flat[i * 2 + j] == pytest.approx(single['Race Winner'])
+    assert flat[3] == pytest.approx(0.05 + 13 / 10000)
+
+
+def test_sweep_rejects_grids_over_the_point_limit(monkeypatch):
+    predictor = make_predictor({'Race Winner': StubModel()})
+    monkeypatch.setattr(F1RacePredictor, 'MAX_SWEEP_POINTS', 10)
+
+    with pytest.raises(ValueError, match='limit'):
+        predictor.sweep_predictions(race_input(), {'GridPosition': list(range(1, 6)), 'round': [1, 2, 3]})
+
+
+@pytest.mark.parametrize('axes, message', [
+    ({}, 'At least one sweep axis'),
+    ({'Points': [1, 2]}, 'Cannot sweep'),
+    ({'GridPosition': []}, 'must not be empty'),
+])
+def test_sweep_rejects_unknown_or_empty_axes(axes, message):
+    predictor = make_predictor({'Race Winner': StubModel()})
+    with pytest.raises(ValueError, match=message):
+        predictor.sweep_predictions(race_input(), axes)
+
+
+@pytest.mark.parametrize('axes, message', [
+    ({'GridPosition': [0]}, 'Grid position'),
+    ({'GridPosition': [1, 21]}, 'Grid position'),
+    ({'raceName_encoded': [3, 22]}, 'Track code'),
+])
+def test_sweep_validates_every_axis_value(axes, message):
+    predictor = make_predictor({'Race Winner': StubModel()})
+    with pytest.raises(ValueError, match=message):
+        predictor.sweep_predictions(race_input(), axes)
@@ -0,0 +1,88 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from src.data_collection.race_store import F1RaceStore
+
+
+def result(year, round_num, race_name, driver_id, position, position_text=None, grid=1):
+    return {
+        'year': year, 'round': round_num, 'raceName': race_name, 'date': f'{year}-01-{round_num:02d}',
+        'driverId': driver_id, 'Constructor': 'mercedes' if driver_id == 'hamilton' else 'red_bull',
+        'GridPosition': grid, 'Position': position, 'positionText': position_text or str(position),
+        'Points': max(0, 11 - position), 'status': 'Finished' if position_text is None else 'Retired'
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    rows = [
+        result(2020, 1, 'Monaco Grand Prix', 'hamilton', 1),
+        result(2020, 1, 'Monaco Grand Prix', 'verstappen', 2),
+        result(2020, 2, 'Italian Grand Prix', 'hamilton', 19, 'R'),
+        result(2020, 2, 'Italian Grand Prix', 'verstappen', 1),
+        result(2021, 1, 'Monaco Grand Prix', 'hamilton', 3),
+        result(2021, 1, 'Monaco Grand Prix', 'verstappen', 20, 'R'),
+        result(2021, 2, 'Italian Grand Prix', 'hamilton', 2),
+        result(2021, 2, 'Italian Grand Prix', 'verstappen', 4),
+        result(2022, 1, 'Monaco Grand Prix', 'hamilton', 5),
+    ]
+    store = F1RaceStore(str(tmp_path / 'history.db'))
+    store.write_results(pd.DataFrame(rows))
+    return store
+
+
+def test_driver_form_only_uses_earlier_races(store):
+    form = store.driver_form('hamilton', 2021, 2, 'Italian Grand Prix', window=2)
+
+    # Last two races before 2021 round 2: the 2020 Italian retirement (19) and 2021 Monaco (3)
+    assert form['RecentAvgPosition'] == pytest.approx(11)
+    assert form['AvgTrackPosition'] == pytest.approx(19)
+    assert form['TrackExperience'] == 1
+
+
+def test_driver_form_without_history(store):
+    assert store.driver_form('hamilton', 2020, 1) == {'RecentAvgPosition': None}
+    assert store.driver_form('verstappen', 2021, 1, 'Monaco Grand Prix')['TrackExperience'] == 1
+
+
+def test_average_finish_excludes_unclassified_results(store):
+    # hamilton: 1, 19 (R), 3, 2, 5 -> classified mean of 1, 3, 2, 5
+    assert store.average_finish('hamilton') == pytest.approx(11 / 4)
+    assert store.average_finish('verstappen', 'Monaco Grand Prix') == pytest.approx(2)
+    assert store.average_finish('hamilton', start_year=2030) is None
+
+
+def test_driver_results_filter_by_years_and_track(store):
+    results = store.driver_results('hamilton', 2021, 2022)
+    assert [(row['year'], row['round']) for row in results] == [(2021, 1), (2021, 2), (2022, 1)]
+
+    monaco = store.driver_results('hamilton', race_name='Monaco Grand Prix')
+    assert [row['year'] for row in monaco] == [2020, 2021, 2022]
+    assert store.driver_results('hamilton', 2020, 2020, 'Italian Grand Prix')[0]['positionText'] == 'R'
+
+
+def test_race_results_are_in_finishing_order(store):
+    results = store.race_results(2021, 1)
+    assert [(row['driverId'], row['Position']) for row in results] == [('hamilton', 3), ('verstappen', 20)]
+    assert [row['driverId'] for row in store.race_results(2020, 2)] == ['verstappen', 'hamilton']
+
+
+def query_plan(store, sql, params):
+    return ' '.join(row['detail'] for row in store.query(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+@pytest.mark.parametrize('lookup, index', [
+    (lambda store: store.driver_results('hamilton', 2020, 2021), 'idx_results_driver'),
+    (lambda store: store.driver_results('hamilton', race_name='Monaco Grand Prix'), 'idx_results_driver'),
+    (lambda store: store.track_results('Monaco Grand Prix', 2020, 2021), 'idx_results_race'),
+    (lambda store: store.race_results(2021, 1), 'idx_results_year_round'),
+])
+def test_lookups_use_their_indexes(store, monkeypatch, lookup, index):
+    captured = []
+    original_query = store.query
+    monkeypatch.setattr(store, 'query', lambda sql, params=(): captured.append((sql, params)) or original_query(sql, params))
+    lookup(store)
+
+    plan = query_plan(store, *captured[0])
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan